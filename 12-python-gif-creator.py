@@ -1,22 +1,319 @@
 """
 Python GIF Creator - Multiple Examples
 Install: pip install pillow imageio matplotlib numpy
+
+Every example writes through a pluggable encoder, so the same frames can be
+saved as GIF, animated WebP (lossless or lossy) or APNG:
+    python 12-python-gif-creator.py            # GIF (default)
+    python 12-python-gif-creator.py webp       # lossless animated WebP
+    python 12-python-gif-creator.py webp-lossy # lossy animated WebP
+    python 12-python-gif-creator.py apng       # animated PNG
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, GifImagePlugin
 import imageio
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
+import io
+import json
 import os
+import struct
+import sys
+import zlib
 
 # Create output directory
-os.makedirs('gif_output', exist_ok=True)
+OUTPUT_DIR = 'gif_output'
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+
+# ============================================
+# Animation Encoders
+# ============================================
+class AnimationEncoder:
+    """Base class for animated image encoders.
+
+    Subclasses set ``extension`` and implement ``save_options``; frames may be
+    PIL images, numpy arrays or a FrameSpool, and durations are given in
+    milliseconds.
+
+    Pillow's animated writers keep every frame in memory until the file is
+    written. Encoders that implement ``save_streaming`` (GIF with a shared
+    palette, APNG) instead write a FrameSpool one frame at a time, so memory
+    stays at a frame or two. WebP has no incremental writer in Pillow and
+    always needs the whole animation in RAM.
+    """
+    extension = ''
+
+    def save(self, frames, path_stem, duration=100, loop=0):
+        """Encode frames to ``path_stem + extension`` and return the path"""
+        path = path_stem + self.extension
+        if isinstance(frames, FrameSpool) and hasattr(self, 'save_streaming'):
+            self.save_streaming(frames, path, duration, loop)
+            return path
+        
+        first = self.prepare(frames[0])
+        first.save(path,
+                   save_all=True,
+                   append_images=_PreparedFrames(frames[1:], self.prepare),
+                   duration=duration,
+                   loop=loop,
+                   **self.save_options())
+        return path
+
+    def prepare(self, frame):
+        """Convert one frame to a PIL image ready for Pillow's encoder"""
+        if isinstance(frame, np.ndarray):
+            return Image.fromarray(frame)
+        return frame
+
+    def save_options(self):
+        return {}
+
+
+class _PreparedFrames:
+    """Re-iterable view that prepares frames on demand
+
+    Some Pillow writers (APNG) walk append_images twice, so a one-shot
+    generator is not enough.
+    """
+
+    def __init__(self, frames, prepare):
+        self.frames = frames
+        self.prepare = prepare
+
+    def __iter__(self):
+        for frame in self.frames:
+            yield self.prepare(frame)
+
+
+class GifEncoder(AnimationEncoder):
+    """GIF output (256-color palette per frame)
+
+    Pass a palette image from build_global_palette() to quantize every frame
+    against one shared palette instead of computing a palette per frame.
+    """
+    extension = '.gif'
+
+    def __init__(self, optimize=False, palette=None, **gif_options):
+        # Extra options such as transparency/disposal go straight to Pillow
+        self.optimize = optimize
+        self.palette = palette
+        self.gif_options = gif_options
+
+    def prepare(self, frame, palette=None):
+        image = super().prepare(frame)
+        palette = palette or self.palette
+        if palette is not None:
+            image = image.convert('RGB').quantize(palette=palette,
+                                                  dither=Image.Dither.NONE)
+        return image
+
+    def save_options(self):
+        return dict(optimize=self.optimize, **self.gif_options)
+
+    def save_streaming(self, frames, path, duration=100, loop=0):
+        """Write frames one at a time against a single global palette"""
+        palette = self.palette or build_global_palette(frames)
+        
+        with open(path, 'wb') as f:
+            for i in range(len(frames)):
+                image = self.prepare(frames[i], palette)
+                if i == 0:
+                    header, _ = GifImagePlugin.getheader(
+                        image, info={'loop': loop, 'optimize': False})
+                    f.write(b''.join(header))
+                for block in GifImagePlugin.getdata(image, duration=duration,
+                                                    **self.gif_options):
+                    f.write(block)
+            f.write(b';')  # trailer
+
+
+class WebPEncoder(AnimationEncoder):
+    """Animated WebP output, full color with no palette quantization
+
+    method is the compression effort from 0 (fastest) to 6 (smallest).
+    quality is the lossy quality, or the compression effort when lossless.
+    """
+    extension = '.webp'
+
+    def __init__(self, lossless=True, quality=80, method=4):
+        self.lossless = lossless
+        self.quality = quality
+        self.method = method
+
+    def save_options(self):
+        return dict(lossless=self.lossless, quality=self.quality,
+                    method=self.method)
+
+
+class APNGEncoder(AnimationEncoder):
+    """Animated PNG output, full color with alpha
+
+    compress_level is the zlib level from 0 (fastest) to 9 (smallest).
+    """
+    extension = '.png'
+
+    def __init__(self, compress_level=6, optimize=False):
+        self.compress_level = compress_level
+        self.optimize = optimize
+
+    def save_options(self):
+        return dict(compress_level=self.compress_level,
+                    optimize=self.optimize)
+
+    def save_streaming(self, frames, path, duration=100, loop=0):
+        """Write frames one at a time as APNG chunks
+
+        Each frame is encoded as a standalone PNG and its image data is copied
+        into fcTL/fdAT chunks. Frames are stored whole (no inter-frame
+        cropping), unlike Pillow's writer.
+        """
+        sequence = 0
+        with open(path, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n')
+            for i in range(len(frames)):
+                image = self.prepare(frames[i])
+                buffer = io.BytesIO()
+                image.save(buffer, format='PNG', **self.save_options())
+                chunks = _png_chunks(buffer.getvalue())
+                
+                if i == 0:
+                    for chunk_type, data in chunks:
+                        if chunk_type == b'IDAT':
+                            break
+                        _write_png_chunk(f, chunk_type, data)
+                        if chunk_type == b'IHDR':
+                            _write_png_chunk(f, b'acTL', struct.pack('>II', len(frames), loop))
+                
+                _write_png_chunk(f, b'fcTL', struct.pack(
+                    '>IIIIIHHBB', sequence, image.width, image.height, 0, 0,
+                    duration, 1000, 0, 0))
+                sequence += 1
+                for chunk_type, data in chunks:
+                    if chunk_type != b'IDAT':
+                        continue
+                    if i == 0:
+                        _write_png_chunk(f, b'IDAT', data)
+                    else:
+                        _write_png_chunk(f, b'fdAT', struct.pack('>I', sequence) + data)
+                        sequence += 1
+            _write_png_chunk(f, b'IEND', b'')
+
+
+def _png_chunks(png):
+    """Split encoded PNG bytes into (type, data) chunks"""
+    chunks = []
+    offset = 8  # signature
+    while offset < len(png):
+        length, chunk_type = struct.unpack('>I4s', png[offset:offset + 8])
+        chunks.append((chunk_type, png[offset + 8:offset + 8 + length]))
+        offset += 12 + length
+    return chunks
+
+
+def _write_png_chunk(f, chunk_type, data):
+    f.write(struct.pack('>I', len(data)) + chunk_type + data)
+    f.write(struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+
+
+def build_global_palette(frames, colors=256, max_samples=32):
+    """Analysis pass: compute one palette shared by all frames
+
+    Samples up to max_samples evenly spaced frames, so it works on a
+    FrameSpool without reading every frame into memory.
+    """
+    step = max(1, len(frames) // max_samples)
+    samples = [np.asarray(frames[i]) for i in range(0, len(frames), step)]
+    # Grayscale frames are 2-D; color frames drop any alpha channel
+    samples = [sample if sample.ndim == 2 else sample[..., :3] for sample in samples]
+    strip = Image.fromarray(np.concatenate(samples, axis=0)).convert('RGB')
+    return strip.quantize(colors=colors, method=Image.Quantize.MEDIANCUT)
+
+
+# ============================================
+# Frame Spool (memory-mapped frame store)
+# ============================================
+class FrameSpool:
+    """Disk-backed frame store for animations too long to keep in RAM
+
+    Frames live in a memory-mapped ``.npy`` file of shape
+    (n_frames, height, width, channels), or (n_frames, height, width) for
+    grayscale (channels=1), and dtype uint8. Indexing returns a
+    view into the map, so analysis and encoder passes read frames without
+    copying. A ``.json`` sidecar records how many frames are complete, which
+    lets an interrupted render resume where it stopped.
+    """
+
+    def __init__(self, path_stem, n_frames, height, width, channels=3,
+                 checkpoint_every=50):
+        self.data_path = path_stem + '.npy'
+        self.state_path = path_stem + '.json'
+        self.checkpoint_every = checkpoint_every
+        # Grayscale frames are stored 2-D, the layout Image.fromarray expects
+        shape = (n_frames, height, width) + ((channels,) if channels > 1 else ())
+
+        self.completed = 0
+        if os.path.exists(self.data_path) and os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if tuple(state['shape']) == shape:
+                self.array = np.lib.format.open_memmap(self.data_path, mode='r+')
+                self.completed = state['completed']
+                return
+
+        self.array = np.lib.format.open_memmap(self.data_path, mode='w+',
+                                               dtype=np.uint8, shape=shape)
+        self._checkpoint()
+
+    def __len__(self):
+        return self.completed
+
+    def __getitem__(self, index):
+        return self.array[:self.completed][index]
+
+    def __iter__(self):
+        for i in range(self.completed):
+            yield self.array[i]
+
+    @property
+    def is_complete(self):
+        return self.completed == self.array.shape[0]
+
+    def append(self, frame):
+        """Store the next frame (PIL image or array) and checkpoint periodically"""
+        frame = np.asarray(frame, dtype=np.uint8)
+        self.array[self.completed] = frame.reshape(self.array.shape[1:])
+        self.completed += 1
+        if self.completed % self.checkpoint_every == 0 or self.is_complete:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        # Flush pixel data before recording progress so a crash never
+        # marks unwritten frames as done
+        self.array.flush()
+        with open(self.state_path, 'w') as f:
+            json.dump({'shape': list(self.array.shape),
+                       'completed': self.completed}, f)
+
+    def remove(self):
+        """Delete the spool files once the animation has been encoded"""
+        del self.array
+        os.remove(self.data_path)
+        os.remove(self.state_path)
+
+
+ENCODERS = {
+    'gif': GifEncoder,
+    'webp': lambda: WebPEncoder(lossless=True),
+    'webp-lossy': lambda: WebPEncoder(lossless=False, quality=80),
+    'apng': APNGEncoder,
+}
 
 # ============================================
 # Example 1: Simple Animation with Pillow
 # ============================================
-def create_simple_gif():
+def create_simple_gif(encoder=None):
     """Create a simple animated GIF with moving circle"""
     frames = []
     width, height = 400, 300
@@ -45,19 +342,17 @@ def create_simple_gif():
         
         frames.append(img)
     
-    # Save as GIF
-    frames[0].save('gif_output/simple_animation.gif',
-                   save_all=True,
-                   append_images=frames[1:],
-                   duration=100,
-                   loop=0)
-    print("✓ Created: gif_output/simple_animation.gif")
+    # Save animation
+    encoder = encoder or GifEncoder()
+    path = encoder.save(frames, f'{OUTPUT_DIR}/simple_animation', duration=100)
+    print(f"✓ Created: {path}")
+    return path
 
 
 # ============================================
 # Example 2: Data Visualization GIF
 # ============================================
-def create_chart_gif():
+def create_chart_gif(encoder=None):
     """Create animated bar chart"""
     fig, ax = plt.subplots(figsize=(8, 6))
     
@@ -96,15 +391,20 @@ def create_chart_gif():
     
     plt.close()
     
-    # Save as GIF
-    imageio.mimsave('gif_output/chart_animation.gif', frames, duration=0.2)
-    print("✓ Created: gif_output/chart_animation.gif")
+    # Save animation
+    if encoder is None:
+        path = f'{OUTPUT_DIR}/chart_animation.gif'
+        imageio.mimsave(path, frames, duration=0.2)
+    else:
+        path = encoder.save(frames, f'{OUTPUT_DIR}/chart_animation', duration=200)
+    print(f"✓ Created: {path}")
+    return path
 
 
 # ============================================
 # Example 3: Loading Spinner
 # ============================================
-def create_loading_spinner():
+def create_loading_spinner(encoder=None):
     """Create a loading spinner GIF"""
     frames = []
     size = 200
@@ -133,20 +433,16 @@ def create_loading_spinner():
         
         frames.append(img)
     
-    frames[0].save('gif_output/loading_spinner.gif',
-                   save_all=True,
-                   append_images=frames[1:],
-                   duration=80,
-                   loop=0,
-                   transparency=0,
-                   disposal=2)
-    print("✓ Created: gif_output/loading_spinner.gif")
+    encoder = encoder or GifEncoder(transparency=0, disposal=2)
+    path = encoder.save(frames, f'{OUTPUT_DIR}/loading_spinner', duration=80)
+    print(f"✓ Created: {path}")
+    return path
 
 
 # ============================================
 # Example 4: Text Animation
 # ============================================
-def create_text_animation():
+def create_text_animation(encoder=None):
     """Create animated text GIF"""
     frames = []
     width, height = 500, 200
@@ -182,18 +478,16 @@ def create_text_animation():
         
         frames.append(img)
     
-    frames[0].save('gif_output/text_animation.gif',
-                   save_all=True,
-                   append_images=frames[1:],
-                   duration=150,
-                   loop=0)
-    print("✓ Created: gif_output/text_animation.gif")
+    encoder = encoder or GifEncoder()
+    path = encoder.save(frames, f'{OUTPUT_DIR}/text_animation', duration=150)
+    print(f"✓ Created: {path}")
+    return path
 
 
 # ============================================
 # Example 5: Progress Bar
 # ============================================
-def create_progress_bar():
+def create_progress_bar(encoder=None):
     """Create animated progress bar"""
     frames = []
     width, height = 400, 100
@@ -220,29 +514,68 @@ def create_progress_bar():
         
         frames.append(img)
     
-    frames[0].save('gif_output/progress_bar.gif',
-                   save_all=True,
-                   append_images=frames[1:],
-                   duration=50,
-                   loop=0)
-    print("✓ Created: gif_output/progress_bar.gif")
+    encoder = encoder or GifEncoder()
+    path = encoder.save(frames, f'{OUTPUT_DIR}/progress_bar', duration=50)
+    print(f"✓ Created: {path}")
+    return path
+
+
+# ============================================
+# Example 6: Long Animation via Frame Spool
+# ============================================
+def create_long_animation(encoder=None, n_frames=600):
+    """Render a long animation through a memory-mapped FrameSpool
+
+    Re-running after an interruption skips frames that were already rendered.
+    """
+    width, height = 320, 120
+    spool = FrameSpool(f'{OUTPUT_DIR}/long_animation.spool', n_frames, height, width)
+    if spool.completed:
+        print(f"  Resuming from frame {spool.completed}/{n_frames}")
+    
+    for i in range(spool.completed, n_frames):
+        img = Image.new('RGB', (width, height), color='#2C3E50')
+        draw = ImageDraw.Draw(img)
+        
+        # Sweeping bar
+        x = int((width - 40) * (0.5 + 0.5 * np.sin(2 * np.pi * i / 120)))
+        draw.rectangle([x, 40, x + 40, 80], fill=(78, 205, 196))
+        draw.text((10, 10), f'Frame {i+1}/{n_frames}', fill='white')
+        
+        spool.append(img)
+    
+    # Multi-pass: shared palette from a sample of frames, then encode
+    encoder = encoder or GifEncoder(palette=build_global_palette(spool))
+    path = encoder.save(spool, f'{OUTPUT_DIR}/long_animation', duration=40)
+    spool.remove()
+    print(f"✓ Created: {path}")
+    return path
 
 
 # ============================================
 # Run all examples
 # ============================================
 if __name__ == '__main__':
-    print("Creating GIF animations...\n")
+    fmt = sys.argv[1] if len(sys.argv) > 1 else 'gif'
+    if fmt not in ENCODERS:
+        sys.exit(f"Unknown format '{fmt}', choose from: {', '.join(ENCODERS)}")
+    
+    # GIF keeps each example's own defaults; other formats share one encoder
+    encoder = None if fmt == 'gif' else ENCODERS[fmt]()
+    
+    print(f"Creating {fmt.upper()} animations...\n")
     
-    create_simple_gif()
-    create_chart_gif()
-    create_loading_spinner()
-    create_text_animation()
-    create_progress_bar()
+    create_simple_gif(encoder)
+    create_chart_gif(encoder)
+    create_loading_spinner(encoder)
+    create_text_animation(encoder)
+    create_progress_bar(encoder)
+    create_long_animation(encoder)
     
-    print("\n✅ All GIFs created successfully in 'gif_output' folder!")
+    print(f"\n✅ All {fmt.upper()} animations created successfully in 'gif_output' folder!")
     print("\nTips:")
     print("- Reduce duration for faster animation")
     print("- Increase duration for slower animation")
     print("- Use fewer frames to reduce file size")
     print("- Optimize with: gifsicle -O3 input.gif -o output.gif")
+    print("- Use webp/apng to skip 256-color quantization and shrink output")
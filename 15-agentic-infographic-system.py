@@ -6,13 +6,17 @@ This demonstrates the concept - requires OpenAI API key and additional libraries
 Install: pip install openai pillow matplotlib numpy
 """
 
+import io
 import json
+import os
 import re
-from typing import Dict, List, Any
+import zlib
+from typing import BinaryIO, Dict, Iterable, List, Any, Optional, TextIO, Tuple, Union
 from dataclasses import dataclass
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle, FancyBboxPatch
 import numpy as np
+from PIL import Image
 
 # Note: In production, use actual OpenAI API
 # This is a demonstration of the architecture
@@ -31,6 +35,14 @@ class InfographicConcept:
 class AnalyzerAgent:
     """Agent responsible for analyzing text and extracting key information"""
     
+    STRUCTURE_KEYWORDS = {
+        'sequential': ['first', 'then', 'next', 'finally', 'step'],
+        'comparative': ['versus', 'compared to', 'better than', 'vs'],
+        'hierarchical': ['top', 'bottom', 'level', 'tier'],
+        'temporal': ['timeline', 'history', 'evolution', 'year']
+    }
+    NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?%?')
+    
     def __init__(self):
         self.name = "Analyzer"
     
@@ -45,18 +57,11 @@ class AnalyzerAgent:
         print(f"[{self.name}] Analyzing text structure...")
         
         # Extract numbers and statistics
-        numbers = re.findall(r'\d+(?:\.\d+)?%?', text)
+        numbers = self.NUMBER_PATTERN.findall(text)
         
         # Identify structure keywords
-        structure_keywords = {
-            'sequential': ['first', 'then', 'next', 'finally', 'step'],
-            'comparative': ['versus', 'compared to', 'better than', 'vs'],
-            'hierarchical': ['top', 'bottom', 'level', 'tier'],
-            'temporal': ['timeline', 'history', 'evolution', 'year']
-        }
-        
         detected_structure = 'general'
-        for structure_type, keywords in structure_keywords.items():
+        for structure_type, keywords in self.STRUCTURE_KEYWORDS.items():
             if any(keyword in text.lower() for keyword in keywords):
                 detected_structure = structure_type
                 break
@@ -76,6 +81,153 @@ class AnalyzerAgent:
         print(f"[{self.name}] Found {len(numbers)} data points")
         
         return analysis
+    
+    def analyze_stream(self, source: Union[str, TextIO, Iterable[str]],
+                       chunk_size: int = 1 << 20,
+                       max_data_points: int = 100) -> Dict[str, Any]:
+        """
+        Streaming version of analyze_text for very large inputs.
+        source is a file path, an open text file or an iterable of strings.
+        Memory stays flat: only the first 5 sentences and the first
+        max_data_points numbers are kept, everything else is counted.
+        """
+        print(f"[{self.name}] Analyzing text stream...")
+        
+        state = _StreamAnalysisState(self.STRUCTURE_KEYWORDS, self.NUMBER_PATTERN,
+                                     max_data_points)
+        if isinstance(source, str):
+            with open(source, encoding='utf-8') as f:
+                for chunk in iter(lambda: f.read(chunk_size), ''):
+                    state.feed(chunk)
+        elif hasattr(source, 'read'):
+            for chunk in iter(lambda: source.read(chunk_size), ''):
+                state.feed(chunk)
+        else:
+            for chunk in source:
+                state.feed(chunk)
+        
+        analysis = state.finish()
+        
+        print(f"[{self.name}] Detected structure: {analysis['structure_type']}")
+        print(f"[{self.name}] Found {analysis['data_point_count']} data points")
+        
+        return analysis
+
+
+class _StreamAnalysisState:
+    """Bounded running state for AnalyzerAgent.analyze_stream
+    
+    Each chunk is split like the whole text would be; the pieces that could
+    continue into the next chunk (partial sentence, word, number or keyword)
+    are carried over, so chunk boundaries do not change the result. It
+    matches analyze_text on the joined input except for two bounds: key
+    points are cut at MAX_SENTENCE_CHARS characters, and data_points keeps
+    only the first max_data_points numbers (data_point_count has the total).
+    """
+    
+    MAX_KEY_POINTS = 5
+    MAX_SENTENCE_CHARS = 1000
+    
+    def __init__(self, structure_keywords, number_pattern, max_data_points):
+        self.structure_keywords = structure_keywords
+        self.number_pattern = number_pattern
+        self.max_data_points = max_data_points
+        self.keyword_overlap = max(len(k) for keywords in structure_keywords.values()
+                                   for k in keywords) - 1
+        
+        self.key_points = []
+        self.sentence_count = 0
+        self.sentence_tail = ''
+        self.tail_has_text = False
+        self.word_count = 0
+        self.in_word = False
+        self.data_points = []
+        self.data_point_count = 0
+        self.number_tail = ''
+        self.keyword_tail = ''
+        self.found_structures = set()
+    
+    def feed(self, chunk: str):
+        if not chunk:
+            return
+        self._feed_sentences(chunk)
+        self._feed_words(chunk)
+        self._feed_numbers(chunk)
+        self._feed_keywords(chunk)
+    
+    def finish(self) -> Dict[str, Any]:
+        # Flush whatever is still carried over
+        self._end_sentence(self.sentence_tail, self.tail_has_text)
+        self._count_numbers(self.number_tail)
+        
+        detected_structure = 'general'
+        for structure_type in self.structure_keywords:
+            if structure_type in self.found_structures:
+                detected_structure = structure_type
+                break
+        
+        return {
+            'key_points': self.key_points,
+            'data_points': self.data_points,
+            'data_point_count': self.data_point_count,
+            'structure_type': detected_structure,
+            'word_count': self.word_count,
+            'complexity': 'simple' if self.sentence_count < 5 else 'complex'
+        }
+    
+    def _feed_sentences(self, chunk):
+        pieces = chunk.split('.')
+        for piece in pieces[:-1]:
+            self._append_tail(piece)
+            self._end_sentence(self.sentence_tail, self.tail_has_text)
+            self.sentence_tail = ''
+            self.tail_has_text = False
+        self._append_tail(pieces[-1])
+    
+    def _append_tail(self, piece):
+        self.tail_has_text = self.tail_has_text or bool(piece.strip())
+        # Only the first few sentences are kept, so later ones are just counted
+        if len(self.key_points) < self.MAX_KEY_POINTS:
+            room = self.MAX_SENTENCE_CHARS - len(self.sentence_tail)
+            self.sentence_tail += piece[:max(room, 0)]
+    
+    def _end_sentence(self, sentence, has_text):
+        if not has_text:
+            return
+        self.sentence_count += 1
+        if len(self.key_points) < self.MAX_KEY_POINTS:
+            self.key_points.append(sentence.strip())
+    
+    def _feed_words(self, chunk):
+        words = len(chunk.split())
+        # A word running across the chunk edge was counted twice
+        if self.in_word and not chunk[0].isspace():
+            words -= 1
+        self.word_count += words
+        self.in_word = not chunk[-1].isspace()
+    
+    def _feed_numbers(self, chunk):
+        text = self.number_tail + chunk
+        # Hold back a trailing run that a following chunk could extend
+        cut = len(text)
+        while cut > 0 and (text[cut - 1].isdigit() or text[cut - 1] in '.%'):
+            cut -= 1
+        self._count_numbers(text[:cut])
+        self.number_tail = text[cut:]
+    
+    def _count_numbers(self, text):
+        for match in self.number_pattern.finditer(text):
+            self.data_point_count += 1
+            if len(self.data_points) < self.max_data_points:
+                self.data_points.append(match.group())
+    
+    def _feed_keywords(self, chunk):
+        text = (self.keyword_tail + chunk).lower()
+        for structure_type, keywords in self.structure_keywords.items():
+            if structure_type not in self.found_structures and \
+                    any(keyword in text for keyword in keywords):
+                self.found_structures.add(structure_type)
+        self.keyword_tail = text[-self.keyword_overlap:] if self.keyword_overlap else ''
 
 
 class StrategistAgent:
@@ -391,6 +543,147 @@ class OptimizerAgent:
         return fig
 
 
+@dataclass
+class EncoderSettings:
+    """PNG encoder settings, trading encode speed against file size"""
+    compress_level: int = 6        # zlib level: 0 (fastest) - 9 (smallest)
+    strategy: str = 'default'      # zlib strategy: default, filtered, huffman, rle, fixed
+    optimize: bool = False         # extra size pass; slow, forces max compression
+    palette_colors: Optional[int] = None  # quantize to a palette (e.g. 256) when set
+    
+    STRATEGIES = {
+        'default': zlib.Z_DEFAULT_STRATEGY,
+        'filtered': zlib.Z_FILTERED,
+        'huffman': zlib.Z_HUFFMAN_ONLY,
+        'rle': zlib.Z_RLE,
+        'fixed': zlib.Z_FIXED
+    }
+    
+    def pil_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for PIL's PNG writer"""
+        if self.strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown PNG strategy '{self.strategy}', "
+                             f"choose from: {', '.join(self.STRATEGIES)}")
+        return {
+            'compress_level': self.compress_level,
+            'compress_type': self.STRATEGIES[self.strategy],
+            'optimize': self.optimize
+        }
+    
+    def prepare(self, image: Image.Image) -> Image.Image:
+        """Apply palette mode to a rendered image if requested"""
+        if self.palette_colors:
+            return image.quantize(colors=self.palette_colors,
+                                  method=Image.Quantize.FASTOCTREE)
+        return image
+
+
+class ExporterAgent:
+    """Agent responsible for exporting the final design at multiple sizes"""
+    
+    # Output widths in pixels for the responsive set
+    DEFAULT_SIZES = {
+        'thumbnail': 320,
+        'small': 640,
+        'web': 1280,
+        'print': 2560
+    }
+    RASTER_FORMATS = {'png': 'PNG', 'webp': 'WEBP'}
+    VECTOR_FORMATS = ('svg', 'pdf')
+    
+    def __init__(self):
+        self.name = "Exporter"
+    
+    def encode(self, fig: plt.Figure, fmt: str = 'png',
+               buffer: BinaryIO = None, dpi: float = None,
+               settings: EncoderSettings = None) -> Optional[bytes]:
+        """
+        Encode the figure in memory instead of to a file path.
+        Writes into buffer when given (returns None), otherwise returns bytes.
+        """
+        settings = settings or EncoderSettings()
+        dpi = dpi or fig.dpi
+        target = buffer if buffer is not None else io.BytesIO()
+        
+        if fmt == 'png' and settings.palette_colors:
+            image = settings.prepare(self._render_image(fig, dpi))
+            image.save(target, format='PNG', **settings.pil_kwargs())
+        elif fmt == 'png':
+            fig.savefig(target, format='png', dpi=dpi, bbox_inches='tight',
+                        pil_kwargs=settings.pil_kwargs())
+        else:
+            fig.savefig(target, format=fmt, dpi=dpi, bbox_inches='tight')
+        
+        if buffer is None:
+            return target.getvalue()
+        return None
+    
+    def export(self, fig: plt.Figure, basename: str,
+               sizes: Dict[str, int] = None,
+               formats: List[str] = None,
+               settings: EncoderSettings = None) -> Dict[Tuple[str, str], str]:
+        """
+        Render the figure once and write every size/format combination:
+        - One high-resolution raster render, downsampled for each size
+        - One vector render per vector format (size independent)
+        Returns a mapping of (size_name, format) -> path
+        """
+        sizes = sizes or self.DEFAULT_SIZES
+        formats = formats or ['png', 'webp', 'svg', 'pdf']
+        settings = settings or EncoderSettings()
+        print(f"[{self.name}] Exporting {len(sizes)} sizes as {', '.join(formats)}...")
+        
+        directory = os.path.dirname(basename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        outputs = {}
+        
+        # Vector formats scale freely, so they are drawn once each
+        for fmt in formats:
+            if fmt in self.VECTOR_FORMATS:
+                path = f"{basename}.{fmt}"
+                fig.savefig(path, format=fmt, bbox_inches='tight')
+                outputs[('vector', fmt)] = path
+        
+        raster_formats = [fmt for fmt in formats if fmt in self.RASTER_FORMATS]
+        if raster_formats:
+            master = self._render_master(fig, max(sizes.values()))
+            for size_name, width in sorted(sizes.items(), key=lambda item: -item[1]):
+                height = max(1, round(master.height * width / master.width))
+                image = master.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+                for fmt in raster_formats:
+                    path = f"{basename}_{size_name}.{fmt}"
+                    if fmt == 'png':
+                        settings.prepare(image).save(path, format='PNG',
+                                                     **settings.pil_kwargs())
+                    else:
+                        image.save(path, format=self.RASTER_FORMATS[fmt])
+                    outputs[(size_name, fmt)] = path
+        
+        print(f"[{self.name}] Wrote {len(outputs)} files")
+        
+        return outputs
+    
+    def _render_master(self, fig: plt.Figure, width: int) -> Image.Image:
+        """Draw the figure once at a DPI that yields the largest requested width"""
+        pad_inches = 0.1
+        bbox = fig.get_tightbbox()
+        dpi = width / (bbox.width + 2 * pad_inches)
+        return self._render_image(fig, dpi, pad_inches)
+    
+    def _render_image(self, fig: plt.Figure, dpi: float,
+                      pad_inches: float = 0.1) -> Image.Image:
+        """Draw the figure to an RGBA image"""
+        # Uncompressed PNG: the buffer is only decoded again, never stored
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=dpi,
+                    bbox_inches='tight', pad_inches=pad_inches,
+                    pil_kwargs={'compress_level': 0})
+        buffer.seek(0)
+        return Image.open(buffer).convert('RGBA')
+
+
 class InfographicAgentSystem:
     """Main orchestrator for the multi-agent system"""
     
@@ -399,6 +692,7 @@ class InfographicAgentSystem:
         self.strategist = StrategistAgent()
         self.designer = DesignerAgent()
         self.optimizer = OptimizerAgent()
+        self.exporter = ExporterAgent()
     
     def create_infographic(self, text: str, 
                           preferences: Dict[str, Any] = None) -> plt.Figure:
@@ -417,6 +711,31 @@ class InfographicAgentSystem:
         print("-" * 60)
         analysis = self.analyzer.analyze_text(text)
         
+        return self._design_from_analysis(analysis, preferences)
+    
+    def create_infographic_from_stream(self, source: Union[str, TextIO, Iterable[str]],
+                                       preferences: Dict[str, Any] = None) -> plt.Figure:
+        """
+        Pipeline for inputs too large to hold as one string
+        (file path, open text file or iterable of chunks)
+        """
+        if preferences is None:
+            preferences = {}
+        
+        print("\n" + "="*60)
+        print("INFOGRAPHIC GENERATION PIPELINE (STREAMING)")
+        print("="*60 + "\n")
+        
+        # Step 1: Analyze
+        print("STEP 1: Analysis")
+        print("-" * 60)
+        analysis = self.analyzer.analyze_stream(source)
+        
+        return self._design_from_analysis(analysis, preferences)
+    
+    def _design_from_analysis(self, analysis: Dict[str, Any],
+                              preferences: Dict[str, Any]) -> plt.Figure:
+        """Steps 2-4 of the pipeline, shared by text and stream inputs"""
         # Step 2: Strategy
         print("\nSTEP 2: Strategy")
         print("-" * 60)
@@ -437,6 +756,33 @@ class InfographicAgentSystem:
         print("="*60 + "\n")
         
         return final_fig
+    
+    def export(self, fig: plt.Figure, basename: str,
+               sizes: Dict[str, int] = None,
+               formats: List[str] = None,
+               settings: EncoderSettings = None) -> Dict[Tuple[str, str], str]:
+        """
+        Export a generated infographic at every size and format in one call
+        """
+        return self.exporter.export(fig, basename, sizes, formats, settings)
+    
+    def create_infographic_bytes(self, text: str,
+                                 preferences: Dict[str, Any] = None,
+                                 fmt: str = 'png',
+                                 buffer: BinaryIO = None,
+                                 settings: EncoderSettings = None) -> Optional[bytes]:
+        """
+        Run the pipeline and return the encoded image without touching disk.
+        Writes into buffer when given (returns None), otherwise returns bytes.
+        """
+        preferences = preferences or {}
+        fig = self.create_infographic(text, preferences)
+        try:
+            return self.exporter.encode(fig, fmt, buffer,
+                                        dpi=preferences.get('dpi', 150),
+                                        settings=settings)
+        finally:
+            plt.close(fig)
 
 
 # ============================================
@@ -493,6 +839,28 @@ if __name__ == '__main__':
                  bbox_inches='tight', dpi=150)
     print("✓ Saved: gif_output/infographic_timeline.png\n")
     
+    # Example 4: Responsive export (one render, every size and format)
+    print("\nExample 4: Responsive Export")
+    outputs = system.export(fig1, 'gif_output/infographic_process')
+    for (size_name, fmt), path in outputs.items():
+        print(f"✓ Saved: {path}")
+    print()
+    
+    # Example 5: In-memory encoding with fast PNG settings (e.g. HTTP responses)
+    print("\nExample 5: In-Memory Output")
+    png_bytes = system.create_infographic_bytes(
+        text1, {'dpi': 150},
+        settings=EncoderSettings(compress_level=1, strategy='rle'))
+    print(f"✓ Encoded {len(png_bytes)} bytes of PNG in memory\n")
+    
+    # Example 6: Streaming analysis (input read in chunks, memory stays flat)
+    print("\nExample 6: Streaming Input")
+    log_chunks = (f"Step {i}: processed {i * 10} records. " for i in range(100000))
+    fig6 = system.create_infographic_from_stream(log_chunks, {'dpi': 150})
+    fig6.savefig('gif_output/infographic_stream.png',
+                 bbox_inches='tight', dpi=150)
+    print("✓ Saved: gif_output/infographic_stream.png\n")
+    
     print("✅ All infographics generated successfully!")
     print("\nNote: This is a demonstration of the agentic architecture.")
     print("For production use, integrate with:")
@@ -0,0 +1,370 @@
+"""
+Warm-Worker Render Server - Infographics and GIFs over HTTP
+Install: pip install pillow imageio matplotlib numpy
+
+Keeps a pool of worker processes with matplotlib, numpy, imageio, fonts and
+layout templates already loaded, so render jobs skip interpreter start-up and
+import cost. Jobs are queued by priority; when the queue is full the server
+answers 503 instead of piling up work.
+
+Run:
+    python 18-render-server.py --port 8765 --workers 4
+    python 18-render-server.py --socket /tmp/render.sock
+
+Render an infographic (lower priority number runs first):
+    curl -X POST localhost:8765/render -o out.png -d '{
+        "kind": "infographic", "priority": 0,
+        "text": "First, plan. Then, build. Finally, ship.",
+        "format": "png", "settings": {"compress_level": 1}}'
+
+Render one of the GIF examples:
+    curl -X POST localhost:8765/render -o spinner.webp -d '{
+        "kind": "gif", "example": "loading_spinner", "format": "webp"}'
+
+Queue status:
+    curl localhost:8765/health
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'svg': 'image/svg+xml',
+    'pdf': 'application/pdf',
+    'gif': 'image/gif',
+    'apng': 'image/apng',
+    'webp-lossy': 'image/webp'
+}
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+# ============================================
+# Worker process
+# ============================================
+_infographics = None
+_gifs = None
+_system = None
+
+
+def _load_example(filename, module_name):
+    """Import one of the numbered example scripts as a module"""
+    spec = importlib.util.spec_from_file_location(
+        module_name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _init_worker():
+    """Warm a worker: imports, font cache and one render per layout template"""
+    global _infographics, _gifs, _system
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib import font_manager
+
+    _infographics = _load_example('15-agentic-infographic-system.py',
+                                  'agentic_infographic_system')
+    _gifs = _load_example('12-python-gif-creator.py', 'python_gif_creator')
+
+    # Each worker runs one job at a time, so a private output
+    # directory keeps concurrent GIF jobs from overwriting each other
+    _gifs.OUTPUT_DIR = tempfile.mkdtemp(prefix='render-worker-')
+
+    font_manager.findfont(font_manager.FontProperties(family=['sans-serif']))
+    _system = _infographics.InfographicAgentSystem()
+    templates = [
+        'First, plan. Then, build. Finally, ship.',
+        'Option A is better than option B. Option B versus option A.',
+        'The timeline of the company began in 2020. By 2021 it grew.',
+        'Key facts about the product.'
+    ]
+    for text in templates:
+        plt.close(_system.create_infographic(text))
+
+
+def _run_job(job):
+    """Render one job in a warm worker and return (bytes, content_type)"""
+    kind = job.get('kind')
+    fmt = job.get('format', 'png' if kind == 'infographic' else 'gif')
+
+    if kind == 'infographic':
+        settings = _infographics.EncoderSettings(**job.get('settings', {}))
+        data = _system.create_infographic_bytes(
+            job['text'], job.get('preferences'), fmt=fmt, settings=settings)
+        return data, CONTENT_TYPES.get(fmt, 'application/octet-stream')
+
+    if kind == 'gif':
+        render = getattr(_gifs, f"create_{job['example']}", None)
+        if render is None:
+            raise ValueError(f"Unknown GIF example '{job['example']}'")
+        encoder = None if fmt == 'gif' else _gifs.ENCODERS[fmt]()
+        path = render(encoder)
+        try:
+            with open(path, 'rb') as f:
+                return f.read(), CONTENT_TYPES.get(fmt, 'application/octet-stream')
+        finally:
+            os.remove(path)
+
+    raise ValueError(f"Unknown job kind '{kind}'")
+
+
+def _ping():
+    # Stay busy briefly so one fast worker cannot answer every ping
+    time.sleep(0.1)
+    return os.getpid()
+
+
+# ============================================
+# Scheduler: priority queue with backpressure
+# ============================================
+class RenderScheduler:
+    """Feeds queued jobs to the worker pool in priority order
+
+    One dispatcher thread per worker keeps at most one job in flight per
+    process, so everything else waits in the priority queue where a newer,
+    more urgent job can still overtake it.
+    """
+
+    def __init__(self, workers=4, max_queue=64):
+        self.workers = workers
+        self.jobs = queue.PriorityQueue(maxsize=max_queue)
+        self.sequence = itertools.count()
+        self.pool = self._new_pool()
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.pool_lock = threading.Lock()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker)
+
+    def _warm(self, pool):
+        print(f"Warming {self.workers} workers...")
+        # A ping only runs once its worker's initializer has finished
+        pids = set()
+        while len(pids) < self.workers:
+            warmups = [pool.submit(_ping) for _ in range(self.workers)]
+            pids.update(future.result() for future in warmups)
+        print(f"✓ {len(pids)} workers ready")
+
+    def _replace_pool(self, broken):
+        """Swap a broken pool (a worker died) for a fresh, warmed one"""
+        with self.pool_lock:
+            # Other dispatchers may see the same break; rebuild only once
+            if self.pool is not broken:
+                return
+            print("Worker pool broken, restarting workers...")
+            broken.shutdown(wait=False, cancel_futures=True)
+            pool = self._new_pool()
+            self._warm(pool)
+            self.pool = pool
+
+    def _submit(self, job):
+        """Hand a job to the current pool, replacing it first if already broken"""
+        while True:
+            # Blocks while another dispatcher is rebuilding the pool
+            with self.pool_lock:
+                pool = self.pool
+            try:
+                return pool, pool.submit(_run_job, job)
+            except BrokenProcessPool:
+                # The job never started, so it is safe to retry it
+                self._replace_pool(pool)
+
+    def start(self):
+        """Spawn and warm every worker, then start dispatching"""
+        self._warm(self.pool)
+        for _ in range(self.workers):
+            threading.Thread(target=self._dispatch, daemon=True).start()
+
+    def submit(self, job, priority=10):
+        """Queue a job; raises queue.Full when the server is saturated"""
+        result = Future()
+        self.jobs.put_nowait((priority, next(self.sequence), job, result))
+        return result
+
+    def status(self):
+        with self.lock:
+            in_flight = self.in_flight
+        return {
+            'workers': self.workers,
+            'queued': self.jobs.qsize(),
+            'max_queue': self.jobs.maxsize,
+            'in_flight': in_flight
+        }
+
+    def _dispatch(self):
+        while True:
+            _, _, job, result = self.jobs.get()
+            if not result.set_running_or_notify_cancel():
+                continue
+            with self.lock:
+                self.in_flight += 1
+            try:
+                result.set_result(self._run(job))
+            except Exception as e:
+                result.set_exception(e)
+            finally:
+                with self.lock:
+                    self.in_flight -= 1
+
+    def _run(self, job, attempts=2):
+        """Run a job, rebuilding the pool if a worker dies
+
+        A dead worker breaks every job pending in that pool, not just the one
+        that crashed it, so broken jobs are retried once on the new pool. A
+        job whose worker dies again is failed.
+        """
+        for attempt in range(attempts):
+            pool, future = self._submit(job)
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                self._replace_pool(pool)
+                if attempt == attempts - 1:
+                    raise
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+# ============================================
+# HTTP front end
+# ============================================
+class RenderHandler(BaseHTTPRequestHandler):
+    """POST /render runs a job, GET /health reports queue state"""
+
+    scheduler = None
+    job_timeout = 120
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {'error': 'not found'})
+            return
+        self._send_json(200, self.scheduler.status())
+
+    def do_POST(self):
+        if self.path != '/render':
+            self._send_json(404, {'error': 'not found'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            job = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(job, dict):
+                raise ValueError('body must be a JSON object')
+            priority = int(job.pop('priority', 10))
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {'error': f'invalid job: {e}'})
+            return
+
+        try:
+            result = self.scheduler.submit(job, priority)
+        except queue.Full:
+            self._send_json(503, {'error': 'render queue full'},
+                            headers={'Retry-After': '1'})
+            return
+
+        try:
+            data, content_type = result.result(timeout=self.job_timeout)
+        except TimeoutError:
+            # A job still in the queue is dropped by its dispatcher instead
+            # of rendering for a client that is gone; a running one finishes
+            result.cancel()
+            self._send_json(504, {'error': f'render timed out after {self.job_timeout}s'})
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': f'{type(e).__name__}: {e}'})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        view = memoryview(data)
+        for start in range(0, len(view), STREAM_CHUNK_SIZE):
+            self.wfile.write(view[start:start + STREAM_CHUNK_SIZE])
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return 'unix-socket'
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(host='127.0.0.1', port=8765, socket_path=None, workers=4, max_queue=64):
+    """Start the scheduler and serve until interrupted"""
+    scheduler = RenderScheduler(workers=workers, max_queue=max_queue)
+    scheduler.start()
+    RenderHandler.scheduler = scheduler
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, RenderHandler)
+        print(f"✓ Render server listening on unix:{socket_path}")
+    else:
+        server = ThreadingHTTPServer((host, port), RenderHandler)
+        print(f"✓ Render server listening on http://{host}:{port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+        scheduler.shutdown()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Warm-worker render server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--socket', help='serve on a Unix socket instead of TCP')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--max-queue', type=int, default=64,
+                        help='queued jobs before new ones are rejected with 503')
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.socket, args.workers, args.max_queue)
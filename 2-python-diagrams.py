@@ -1,16 +1,171 @@
 """
 Python Diagrams - Cloud Architecture Visualization
 Install: pip install diagrams
+
+CachedDiagram skips Graphviz layout when the topology has not changed:
+- Same DOT source as a previous run: the cached image is copied
+- Same nodes, clusters and edges, new labels or styles: the cached
+  positions are re-applied and only drawing runs (neato -n2)
+- New topology: full dot layout, which is then cached
+The cache lives in .diagram_cache/ next to the output.
 """
 
-from diagrams import Diagram, Cluster
+import hashlib
+import itertools
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import graphviz
+from diagrams import Diagram, Cluster, Node
 from diagrams.aws.compute import EC2, Lambda
 from diagrams.aws.database import RDS, ElastiCache
 from diagrams.aws.network import ELB, CloudFront
 from diagrams.aws.storage import S3
 
+CACHE_DIR = '.diagram_cache'
+
+# An attribute list like [label="a]b" color=red], quote-aware
+ATTR_LIST = re.compile(r'\[(?:[^\]"]|"(?:[^"\\]|\\.)*")*\]', re.DOTALL)
+# Graph, node and edge attributes that change the layout rather than just the look
+LAYOUT_ATTRS = re.compile(
+    r'\b(rankdir|nodesep|ranksep|splines|newrank|compound|rank'
+    r'|width|height|fixedsize'
+    r'|minlen|constraint|weight|headport|tailport)=("[^"]*"|[^\s\],;]+)')
+
+
+def topology_key(source):
+    """Hash the structure of a DOT source: nodes, clusters, edges, layout options
+
+    In every attribute list, only the options that affect layout (graph
+    spacing and rank settings, node sizes, edge lengths, weights and ports)
+    are kept, so label, color or icon edits keep the same key.
+    """
+    def keep_layout(match):
+        return ' '.join(''.join(pair) for pair in LAYOUT_ATTRS.findall(match.group()))
+
+    skeleton = ATTR_LIST.sub(keep_layout, source)
+    return hashlib.sha256(skeleton.encode()).hexdigest()
+
+
+def run_graphviz(args, source):
+    result = subprocess.run(args, input=source.encode(), capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{args[0]} failed: {result.stderr.decode().strip()}")
+    return result.stdout
+
+
+def apply_layout(source, layout):
+    """Insert cached positions (from dot -Tjson) into a DOT source"""
+    nodes = {}
+    clusters = {}
+    for obj in layout.get('objects', []):
+        if 'nodes' in obj or 'edges' in obj:
+            clusters[obj['name']] = obj
+        else:
+            nodes[obj['_gvid']] = obj
+    node_pos = {obj['name']: obj['pos'] for obj in nodes.values()}
+
+    edge_pos = {}
+    for edge in layout.get('edges', []):
+        key = (nodes[edge['tail']]['name'], nodes[edge['head']]['name'])
+        edge_pos.setdefault(key, []).append(edge)
+
+    def layout_attrs(obj, keys):
+        return ' '.join(f'{k}="{obj[k]}"' for k in keys if k in obj)
+
+    def graph_line(match):
+        name = match.group(2).strip('"')
+        obj = clusters.get(name, layout if match.group(1) == 'digraph' else None)
+        if obj is None:
+            return match.group(0)
+        return f'{match.group(0)}\n\tgraph [{layout_attrs(obj, ("bb", "lp"))}]'
+
+    seen = {}
+
+    def edge_line(match):
+        indent, tail, head = match.groups()
+        index = seen.get((tail, head), 0)
+        seen[(tail, head)] = index + 1
+        edges = edge_pos.get((tail, head), [])
+        if index >= len(edges):
+            return match.group(0)
+        return f'{indent}{tail} -> {head} [{layout_attrs(edges[index], ("pos", "lp"))}]'
+
+    def node_line(match):
+        indent, name = match.groups()
+        if name not in node_pos:
+            return match.group(0)
+        return f'{indent}{name} [pos="{node_pos[name]}"]'
+
+    source = re.sub(r'^\s*(digraph|subgraph) ("[^"]*"|\w+) \{', graph_line, source, flags=re.M)
+    source = re.sub(r'^(\s*)(\w+) -> (\w+)', edge_line, source, flags=re.M)
+    source = re.sub(r'^(\s*)(\w+)(?= \[)', node_line, source, flags=re.M)
+    return source
+
+
+class CachedDiagram(Diagram):
+    """Diagram that reuses the Graphviz layout while the topology is unchanged"""
+
+    def __enter__(self):
+        # Stable node ids (instead of random uuids) make the DOT source
+        # identical between runs of an unchanged script
+        self._saved_rand_id = Node.__dict__['_rand_id']
+        counter = itertools.count()
+        Node._rand_id = staticmethod(lambda: f'n{next(counter)}')
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            super().__exit__(exc_type, exc_value, traceback)
+        finally:
+            Node._rand_id = self._saved_rand_id
+
+    def render(self):
+        formats = self.outformat if isinstance(self.outformat, list) else [self.outformat]
+        source = self.dot.source
+        # Diagram.__exit__ removes the DOT file after rendering, so it must exist
+        self.dot.save()
+
+        layouts = os.path.join(CACHE_DIR, 'layouts')
+        renders = os.path.join(CACHE_DIR, 'renders')
+        os.makedirs(layouts, exist_ok=True)
+        os.makedirs(renders, exist_ok=True)
+
+        source_key = hashlib.sha256(source.encode()).hexdigest()
+        layout_path = os.path.join(layouts, topology_key(source) + '.json')
+        positioned = None
+
+        for fmt in formats:
+            output = f'{self.filename}.{fmt}'
+            cached = os.path.join(renders, f'{source_key}.{fmt}')
+            if os.path.exists(cached):
+                print(f"[cache] {output}: unchanged, reused image")
+            else:
+                if positioned is None:
+                    if os.path.exists(layout_path):
+                        print(f"[cache] {output}: same topology, reusing layout")
+                    else:
+                        print(f"[cache] {output}: new topology, running dot layout")
+                        layout = run_graphviz(['dot', '-Tjson'], source)
+                        with open(layout_path, 'wb') as f:
+                            f.write(layout)
+                    with open(layout_path) as f:
+                        positioned = apply_layout(source, json.load(f))
+
+                image = run_graphviz(['neato', '-n2', f'-T{fmt}'], positioned)
+                with open(cached, 'wb') as f:
+                    f.write(image)
+
+            shutil.copyfile(cached, output)
+            if self.show:
+                graphviz.view(output, quiet=True)
+
+
 # Create a cloud architecture diagram
-with Diagram("Web Service Architecture", show=False, direction="LR"):
+with CachedDiagram("Web Service Architecture", show=False, direction="LR"):
     cdn = CloudFront("CDN")
     
     with Cluster("Load Balancing"):
@@ -1,51 +1,202 @@
 """
 Python Matplotlib - Data Visualization
 Install: pip install matplotlib numpy
+
+Runs headless by default: the 2x2 grid and each panel on its own are laid
+out once, then written as PNG, SVG and PDF in parallel worker processes, one
+per figure and format. Pass --show to also open the grid in a window.
 """
 
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+from matplotlib.image import AxesImage
 import numpy as np
 
-# Create figure with multiple subplots
-fig, axes = plt.subplots(2, 2, figsize=(12, 10))
-fig.suptitle('Data Visualization Examples', fontsize=16)
-
-# 1. Line Chart
-x = np.linspace(0, 10, 100)
-axes[0, 0].plot(x, np.sin(x), label='sin(x)', color='blue')
-axes[0, 0].plot(x, np.cos(x), label='cos(x)', color='red')
-axes[0, 0].set_title('Line Chart')
-axes[0, 0].set_xlabel('X axis')
-axes[0, 0].set_ylabel('Y axis')
-axes[0, 0].legend()
-axes[0, 0].grid(True, alpha=0.3)
-
-# 2. Bar Chart
-categories = ['Q1', 'Q2', 'Q3', 'Q4']
-values = [23, 45, 56, 78]
-colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A']
-axes[0, 1].bar(categories, values, color=colors)
-axes[0, 1].set_title('Quarterly Sales')
-axes[0, 1].set_ylabel('Revenue ($K)')
-
-# 3. Scatter Plot
-x_scatter = np.random.randn(100)
-y_scatter = np.random.randn(100)
-colors_scatter = np.random.rand(100)
-axes[1, 0].scatter(x_scatter, y_scatter, c=colors_scatter, cmap='viridis', alpha=0.6)
-axes[1, 0].set_title('Scatter Plot')
-axes[1, 0].set_xlabel('Feature 1')
-axes[1, 0].set_ylabel('Feature 2')
-
-# 4. Pie Chart
-sizes = [30, 25, 20, 15, 10]
-labels = ['Product A', 'Product B', 'Product C', 'Product D', 'Others']
-explode = (0.1, 0, 0, 0, 0)
-axes[1, 1].pie(sizes, explode=explode, labels=labels, autopct='%1.1f%%',
-               shadow=True, startangle=90)
-axes[1, 1].set_title('Market Share')
-
-plt.tight_layout()
-plt.savefig('data_visualization.png', dpi=300, bbox_inches='tight')
-print("Chart saved as 'data_visualization.png'")
-plt.show()
+# Output and scatter rendering settings
+SAVE_DPI = 300
+N_SCATTER_POINTS = 100
+RASTERIZE_THRESHOLD = 10_000       # above this, scatter markers are rasterized in SVG/PDF
+DENSITY_THRESHOLD = 200_000        # above this, points are binned into a density image
+OUTPUT_FORMATS = ('png', 'svg', 'pdf')
+OUTPUT_DIR = 'chart_output'
+GRID_NAME = 'data_visualization'
+
+
+class DensityImage(AxesImage):
+    """Datashader-style scatter: points binned into one bin per output pixel
+
+    The histogram is computed when the image is drawn, from the axes extent
+    in the renderer's pixels, so it follows the final layout and the DPI of
+    whichever format is being written. Rendering cost depends on that pixel
+    size, not the point count. With c, each pixel shows the mean of c over
+    its points; otherwise the point count on a log scale.
+    """
+
+    def __init__(self, ax, x, y, c=None, cmap='viridis'):
+        super().__init__(ax, cmap=cmap, norm=LogNorm() if c is None else None,
+                         origin='lower', interpolation='nearest')
+        self.points = (x, y, c)
+        self.bins = None
+        ax.add_image(self)
+        self.set_extent([x.min(), x.max(), y.min(), y.max()])
+
+    def draw(self, renderer):
+        # Vector backends draw images at the savefig DPI, not at 72 dpi
+        scale = renderer.get_image_magnification()
+        box = self.axes.get_window_extent(renderer)
+        bins = (max(1, int(box.width * scale)), max(1, int(box.height * scale)))
+        if bins != self.bins:
+            self.bins = bins
+            image = self.bin_points(bins)
+            self.set_data(image)
+            self.norm.autoscale(image)
+        super().draw(renderer)
+
+    def bin_points(self, bins):
+        x, y, c = self.points
+        extent = self.get_extent()
+        bounds = [extent[:2], extent[2:]]
+        counts, _, _ = np.histogram2d(x, y, bins=bins, range=bounds)
+        if c is None:
+            image = np.ma.masked_equal(counts, 0)
+        else:
+            sums, _, _ = np.histogram2d(x, y, bins=bins, range=bounds, weights=c)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                image = np.ma.masked_invalid(sums / counts)
+        # histogram2d is indexed [x, y]; images want rows of y
+        return image.T
+
+
+def scatter_auto(ax, x, y, c=None, cmap='viridis', alpha=0.6):
+    """Plain scatter for small data, rasterized or density-binned for large data"""
+    if len(x) > DENSITY_THRESHOLD:
+        return DensityImage(ax, x, y, c=c, cmap=cmap)
+    return ax.scatter(x, y, c=c, cmap=cmap, alpha=alpha,
+                      rasterized=len(x) > RASTERIZE_THRESHOLD)
+
+
+# ============================================
+# Panels
+# ============================================
+def make_data():
+    """Generate the data once so every figure shows the same points"""
+    return {
+        'x_scatter': np.random.randn(N_SCATTER_POINTS),
+        'y_scatter': np.random.randn(N_SCATTER_POINTS),
+        'colors_scatter': np.random.rand(N_SCATTER_POINTS)
+    }
+
+
+def plot_line(ax, data):
+    """1. Line Chart"""
+    x = np.linspace(0, 10, 100)
+    ax.plot(x, np.sin(x), label='sin(x)', color='blue')
+    ax.plot(x, np.cos(x), label='cos(x)', color='red')
+    ax.set_title('Line Chart')
+    ax.set_xlabel('X axis')
+    ax.set_ylabel('Y axis')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+
+def plot_bar(ax, data):
+    """2. Bar Chart"""
+    categories = ['Q1', 'Q2', 'Q3', 'Q4']
+    values = [23, 45, 56, 78]
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A']
+    ax.bar(categories, values, color=colors)
+    ax.set_title('Quarterly Sales')
+    ax.set_ylabel('Revenue ($K)')
+
+
+def plot_scatter(ax, data):
+    """3. Scatter Plot"""
+    scatter_auto(ax, data['x_scatter'], data['y_scatter'],
+                 c=data['colors_scatter'], cmap='viridis', alpha=0.6)
+    ax.set_title('Scatter Plot')
+    ax.set_xlabel('Feature 1')
+    ax.set_ylabel('Feature 2')
+
+
+def plot_pie(ax, data):
+    """4. Pie Chart"""
+    sizes = [30, 25, 20, 15, 10]
+    labels = ['Product A', 'Product B', 'Product C', 'Product D', 'Others']
+    explode = (0.1, 0, 0, 0, 0)
+    ax.pie(sizes, explode=explode, labels=labels, autopct='%1.1f%%',
+           shadow=True, startangle=90)
+    ax.set_title('Market Share')
+
+
+PANELS = {
+    'line_chart': plot_line,
+    'bar_chart': plot_bar,
+    'scatter_plot': plot_scatter,
+    'pie_chart': plot_pie
+}
+
+
+# ============================================
+# Figures and export
+# ============================================
+def build_grid(data, figure=Figure):
+    """Compose the 2x2 grid from the panel functions"""
+    fig = figure(figsize=(12, 10))
+    axes = fig.subplots(2, 2)
+    fig.suptitle('Data Visualization Examples', fontsize=16)
+    for ax, plot in zip(axes.flat, PANELS.values()):
+        plot(ax, data)
+    return fig
+
+
+def build_panel(name, data, figure=Figure):
+    """One panel as an independent figure"""
+    fig = figure(figsize=(6, 5))
+    PANELS[name](fig.subplots(), data)
+    return fig
+
+
+def init_worker():
+    # Workers only ever write files, whatever backend the parent uses
+    matplotlib.use('Agg')
+
+
+def render_job(fig, path):
+    """Worker entry point: write one already laid-out figure in one format"""
+    fig.savefig(path, dpi=SAVE_DPI)
+    return path
+
+
+def export_all(data, output_dir=OUTPUT_DIR, formats=OUTPUT_FORMATS, workers=None):
+    """Write the grid and every panel, one worker process per figure and format
+
+    Each figure is built and laid out once here; the workers receive a copy
+    of it and only draw and encode, which is where the time goes.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    figures = {GRID_NAME: build_grid(data)}
+    figures.update((name, build_panel(name, data)) for name in PANELS)
+    
+    jobs = []
+    for name, fig in figures.items():
+        fig.tight_layout()
+        jobs.extend((fig, os.path.join(output_dir, f'{name}.{fmt}')) for fmt in formats)
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        return list(pool.map(render_job, *zip(*jobs)))
+
+
+if __name__ == '__main__':
+    data = make_data()
+    for path in export_all(data):
+        print(f"Chart saved as '{path}'")
+    
+    if '--show' in sys.argv:
+        build_grid(data, figure=plt.figure).tight_layout()
+        plt.show()
@@ -1,22 +1,413 @@
 """
 Plotly - Interactive Visualizations
 Install: pip install plotly pandas
+
+Compact export: set COMPACT_HTML to write every HTML file against one shared
+plotly.min.js, with numeric arrays as base64 typed arrays (needs plotly.js
+2.28+ in the installed plotly) and optional gzip.
+
+Large-data mode: set N_POINTS to millions of rows and the dashboard switches
+to WebGL traces (Scattergl) and downsamples each panel to TARGET_POINTS before
+anything is serialized, so the HTML stays small and the browser responsive.
 """
 
+import asyncio
+import base64
+import gzip
+import os
+import time
+
+import plotly
 import plotly.graph_objects as go
-import plotly.express as px
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import numpy as np
 import pandas as pd
 
+# Dataset size and large-data settings
+N_POINTS = 100
+LARGE_DATA_THRESHOLD = 10_000      # switch to WebGL + downsampling above this
+TARGET_POINTS = 2_000              # points kept per trace in large-data mode
+DOWNSAMPLE_METHOD = 'lttb'         # 'lttb' or 'minmax'
+LARGE_DATA_MODE = N_POINTS > LARGE_DATA_THRESHOLD
+
+# Animation settings
+MAX_ANIMATION_FRAMES = 500         # longer series are subsampled to this many frames
+
+# HTML export settings
+COMPACT_HTML = False               # shared plotly.js + base64 typed arrays
+GZIP_HTML = False                  # also gzip compact output (.html.gz)
+PLOTLYJS_ASSET = 'assets/plotly.min.js'
+
+
+# ============================================
+# Downsampling helpers
+# ============================================
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of n_out visually key points
+
+    x must be sorted. Bucket selection is sequential by definition, but each
+    bucket's triangle areas are computed in one vectorized numpy step.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Third triangle vertex: average of the next bucket (or the last point)
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) -
+                      (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def minmax_indices(y, n_out):
+    """Keep the min and max of each bucket (fully vectorized)"""
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+    
+    y = np.asarray(y, dtype=float)
+    size = n // n_buckets
+    # Equal buckets up to the last one, which also takes the remainder
+    last = size * (n_buckets - 1)
+    buckets = y[:last].reshape(n_buckets - 1, size)
+    offsets = np.arange(n_buckets - 1) * size
+    tail = y[last:]
+    picked = np.concatenate([offsets + buckets.argmin(axis=1),
+                             offsets + buckets.argmax(axis=1),
+                             [last + tail.argmin(), last + tail.argmax(), 0, n - 1]])
+    return np.unique(picked)
+
+
+def downsample_indices(x, y, n_out=TARGET_POINTS, method=DOWNSAMPLE_METHOD):
+    """Indices to keep for one trace; x is converted to numbers if needed"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype(np.int64)
+    
+    # Scatter clouds are not ordered by x, so reduce them in x order
+    order = np.argsort(x, kind='stable')
+    x_sorted = x[order]
+    y_sorted = np.asarray(y)[order]
+    
+    if method == 'lttb':
+        keep = lttb_indices(x_sorted, y_sorted, n_out)
+    elif method == 'minmax':
+        keep = minmax_indices(y_sorted, n_out)
+    else:
+        raise ValueError(f"Unknown downsample method '{method}'")
+    return order[keep]
+
+
+def scatter_trace(x, y, **kwargs):
+    """go.Scatter for small data; downsampled go.Scattergl in large-data mode
+
+    Per-point marker arrays (marker.color, marker.size) are reduced with the
+    same indices so they stay aligned with x and y.
+    """
+    if not LARGE_DATA_MODE:
+        return go.Scatter(x=x, y=y, **kwargs)
+    
+    keep = downsample_indices(x, y)
+    marker = dict(kwargs.pop('marker', {}))
+    for key in ('color', 'size'):
+        if np.ndim(marker.get(key)) == 1:
+            marker[key] = np.asarray(marker[key])[keep]
+    if marker:
+        kwargs['marker'] = marker
+    return go.Scattergl(x=np.asarray(x)[keep], y=np.asarray(y)[keep], **kwargs)
+
+
+# ============================================
+# Compact HTML export helpers
+# ============================================
+# dtypes plotly.js can decode from base64 typed arrays
+TYPED_ARRAY_DTYPES = {
+    'int8': 'i1', 'uint8': 'u1', 'int16': 'i2', 'uint16': 'u2',
+    'int32': 'i4', 'uint32': 'u4', 'float32': 'f4', 'float64': 'f8'
+}
+MIN_TYPED_ARRAY_LENGTH = 16        # smaller arrays are cheaper as plain JSON
+
+
+def encode_typed_array(values):
+    """Encode a numeric array as a plotly.js base64 typed array, or return None"""
+    try:
+        array = np.asarray(values)
+    except ValueError:
+        return None  # ragged nested lists
+    if array.dtype.kind not in 'iuf' or array.size < MIN_TYPED_ARRAY_LENGTH:
+        return None
+    if array.dtype == np.int64 or array.dtype == np.uint64:
+        # plotly.js has no 64-bit integer typed arrays
+        fits = np.abs(array).max() < 2**31
+        array = array.astype(np.int32 if fits else np.float64)
+    dtype = TYPED_ARRAY_DTYPES.get(array.dtype.name)
+    if dtype is None:
+        array, dtype = array.astype(np.float64), 'f8'
+    
+    encoded = {'dtype': dtype,
+               'bdata': base64.b64encode(np.ascontiguousarray(array).tobytes()).decode()}
+    if array.ndim > 1:
+        encoded['shape'] = ','.join(str(n) for n in array.shape)
+    return encoded
+
+
+def drop_redundant_grids(trace):
+    """Replace meshgrid-style 2-D x/y on surface traces with their 1-D axes"""
+    if trace.get('type') not in ('surface', 'contour', 'heatmap'):
+        return
+    x, y = trace.get('x'), trace.get('y')
+    if x is not None and np.ndim(x) == 2:
+        x = np.asarray(x)
+        if (x == x[0]).all():
+            trace['x'] = x[0]
+    if y is not None and np.ndim(y) == 2:
+        y = np.asarray(y)
+        if (y == y[:, :1]).all():
+            trace['y'] = y[:, 0]
+
+
+def compact_figure_dict(value):
+    """Recursively swap numeric arrays for typed arrays in a figure dict"""
+    if isinstance(value, dict):
+        if 'type' in value:
+            drop_redundant_grids(value)
+        return {key: compact_figure_dict(item) for key, item in value.items()}
+    if isinstance(value, (np.ndarray, list, tuple)):
+        encoded = encode_typed_array(value)
+        if encoded is not None:
+            return encoded
+        return [compact_figure_dict(item) for item in value]
+    return value
+
+
+def write_compact_html(figure, path, plotlyjs_asset=PLOTLYJS_ASSET, gzip_output=GZIP_HTML):
+    """Write HTML that references a shared plotly.js and carries compact data"""
+    asset_dir = os.path.dirname(os.path.abspath(plotlyjs_asset))
+    os.makedirs(asset_dir, exist_ok=True)
+    if not os.path.exists(plotlyjs_asset):
+        with open(plotlyjs_asset, 'w', encoding='utf-8') as f:
+            f.write(plotly.offline.get_plotlyjs())
+    
+    html_dir = os.path.dirname(os.path.abspath(path))
+    script_src = os.path.relpath(os.path.abspath(plotlyjs_asset), html_dir)
+    html = pio.to_html(compact_figure_dict(figure.to_dict()),
+                       include_plotlyjs=script_src.replace(os.sep, '/'),
+                       full_html=True, validate=False)
+    
+    if gzip_output:
+        path += '.gz'
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write(html)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+    return path
+
+
+def save_html(figure, path):
+    """Write figure HTML in the configured export mode and return the path"""
+    if COMPACT_HTML:
+        return write_compact_html(figure, path)
+    figure.write_html(path)
+    return path
+
+
+# ============================================
+# Delta-encoded animation builder
+# ============================================
+def build_frame_animation(data, x, y, size=None, color=None, frame=None,
+                          hover_name=None, max_frames=MAX_ANIMATION_FRAMES,
+                          frame_duration=100, size_max=20, title=None,
+                          range_x=None, range_y=None):
+    """Animated scatter whose frames carry only per-frame data
+
+    px.scatter(animation_frame=...) repeats the full trace definition in
+    every frame. Here the trace styling, colorbar and layout are defined
+    once; attributes that never change across frames are hoisted into that
+    shared trace, and each frame only holds the arrays that vary. Series with
+    more than max_frames frames are subsampled evenly.
+    """
+    frame_values = np.asarray(data.index if frame is None else data[frame])
+    keys = pd.unique(frame_values)
+    if max_frames and len(keys) > max_frames:
+        keys = keys[np.linspace(0, len(keys) - 1, max_frames).astype(np.int64)]
+    keep = np.isin(frame_values, keys)
+    grouped = data[keep].groupby(frame_values[keep], sort=False)
+    
+    # Per-frame values of every animatable attribute
+    per_frame = {}
+    for key, group in grouped:
+        attrs = {'x': group[x].to_numpy(), 'y': group[y].to_numpy()}
+        if size is not None:
+            # Marker sizes must be non-negative; negative values draw at sizemin
+            attrs['marker.size'] = group[size].clip(lower=0).to_numpy()
+        if color is not None:
+            attrs['marker.color'] = group[color].to_numpy()
+        hover = group.index if hover_name is None else group[hover_name]
+        attrs['hovertext'] = np.asarray(hover).astype(str)
+        per_frame[key] = attrs
+    
+    # Attributes equal in every frame live only in the shared trace
+    first = next(iter(per_frame.values()))
+    static = {name for name, value in first.items()
+              if all(np.array_equal(value, attrs[name]) for attrs in per_frame.values())}
+    
+    # Shared trace: styling, colorbar and the first frame's values
+    marker = {}
+    if size is not None:
+        size_peak = max(data[size].max(), 0) or 1
+        marker.update(size=first['marker.size'], sizemode='area', sizemin=4,
+                      sizeref=2.0 * size_peak / size_max ** 2)
+    if color is not None:
+        marker.update(color=first['marker.color'], colorscale='Plasma',
+                      showscale=True, cmin=data[color].min(), cmax=data[color].max(),
+                      colorbar=dict(title=color))
+    base_trace = go.Scatter(
+        x=first['x'], y=first['y'], hovertext=first['hovertext'],
+        mode='markers', marker=marker,
+        hovertemplate=f'%{{hovertext}}<br>{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>')
+    
+    frames = []
+    for key, attrs in per_frame.items():
+        delta = {}
+        for name, value in attrs.items():
+            if name in static:
+                continue
+            if name.startswith('marker.'):
+                delta.setdefault('marker', {})[name.split('.')[1]] = value
+            else:
+                delta[name] = value
+        frames.append(go.Frame(name=str(key), data=[delta], traces=[0]))
+    
+    play_args = dict(frame=dict(duration=frame_duration, redraw=False),
+                     transition=dict(duration=0), mode='immediate')
+    fig_anim = go.Figure(data=[base_trace], frames=frames)
+    fig_anim.update_layout(
+        title_text=title,
+        xaxis=dict(title=x, range=range_x),
+        yaxis=dict(title=y, range=range_y),
+        updatemenus=[dict(
+            type='buttons', direction='left', x=0.1, y=0, xanchor='right', yanchor='top',
+            buttons=[dict(label='Play', method='animate', args=[None, dict(play_args, fromcurrent=True)]),
+                     dict(label='Pause', method='animate', args=[[None], play_args])]
+        )],
+        sliders=[dict(
+            x=0.1, len=0.9, y=0, yanchor='top',
+            currentvalue=dict(prefix='frame='),
+            steps=[dict(label=f.name, method='animate', args=[[f.name], play_args])
+                   for f in frames]
+        )]
+    )
+    return fig_anim
+
+
+# ============================================
+# Batch static image export
+# ============================================
+def export_images(figures, directory='.', fmt='png', width=None, height=None,
+                  scale=1, concurrency=4):
+    """Render many figures to static images through one kaleido renderer
+
+    figures maps output names to figures. With kaleido >= 1.0 one Chromium
+    process renders up to `concurrency` figures at a time in separate tabs;
+    with older kaleido, plotly's persistent renderer is reused sequentially.
+    Returns one dict per figure with name, path, seconds and error (None on
+    success), so failures are reported instead of swallowed.
+    """
+    try:
+        import kaleido
+    except ImportError as e:
+        raise ImportError("Static image export needs kaleido: pip install kaleido") from e
+    
+    os.makedirs(directory, exist_ok=True)
+    jobs = [(name, figure, os.path.join(directory, f'{name}.{fmt}'))
+            for name, figure in figures.items()]
+    opts = {key: value for key, value in
+            dict(format=fmt, width=width, height=height, scale=scale).items()
+            if value is not None}
+    
+    if hasattr(kaleido, 'Kaleido'):
+        return asyncio.run(_export_in_tabs(kaleido, jobs, opts, concurrency))
+    return [_timed_export(name, path, lambda figure=figure: pio.to_image(figure, **opts))
+            for name, figure, path in jobs]
+
+
+async def _export_in_tabs(kaleido, jobs, opts, concurrency):
+    start = time.perf_counter()
+    results = None
+    try:
+        async with kaleido.Kaleido(n=concurrency) as renderer:
+            async def render(name, figure, path):
+                start = time.perf_counter()
+                try:
+                    data = await renderer.calc_fig(figure, opts=opts)
+                except Exception as e:
+                    return _export_result(name, path, start, e)
+                return _write_export(name, path, data, start)
+            
+            results = await asyncio.gather(*(render(*job) for job in jobs))
+    except Exception as e:
+        # Chromium failed to start (or to shut down): report it per figure
+        # unless the figures were already rendered
+        if results is None:
+            return [_export_result(name, path, start, e) for name, _, path in jobs]
+    return results
+
+
+def _timed_export(name, path, render):
+    start = time.perf_counter()
+    try:
+        data = render()
+    except Exception as e:
+        return _export_result(name, path, start, e)
+    return _write_export(name, path, data, start)
+
+
+def _write_export(name, path, data, start):
+    try:
+        with open(path, 'wb') as f:
+            f.write(data)
+    except OSError as e:
+        return _export_result(name, path, start, e)
+    return _export_result(name, path, start)
+
+
+def _export_result(name, path, start, error=None):
+    return {
+        'name': name,
+        'path': path,
+        'seconds': time.perf_counter() - start,
+        'error': None if error is None else f'{type(error).__name__}: {error}'
+    }
+
+
 # Create sample data
 np.random.seed(42)
-dates = pd.date_range('2024-01-01', periods=100)
+dates = pd.date_range('2024-01-01', periods=N_POINTS,
+                      freq='s' if LARGE_DATA_MODE else 'D')
 df = pd.DataFrame({
     'date': dates,
-    'sales': np.cumsum(np.random.randn(100)) + 100,
-    'costs': np.cumsum(np.random.randn(100)) + 80,
-    'profit': np.random.randn(100) * 10 + 20
+    'sales': np.cumsum(np.random.randn(N_POINTS)) + 100,
+    'costs': np.cumsum(np.random.randn(N_POINTS)) + 80,
+    'profit': np.random.randn(N_POINTS) * 10 + 20
 })
 
 # Create subplots
@@ -29,19 +420,19 @@ fig = make_subplots(
 
 # 1. Line Chart
 fig.add_trace(
-    go.Scatter(x=df['date'], y=df['sales'], name='Sales', line=dict(color='blue')),
+    scatter_trace(df['date'], df['sales'], name='Sales', line=dict(color='blue')),
     row=1, col=1
 )
 fig.add_trace(
-    go.Scatter(x=df['date'], y=df['costs'], name='Costs', line=dict(color='red')),
+    scatter_trace(df['date'], df['costs'], name='Costs', line=dict(color='red')),
     row=1, col=1
 )
 
 # 2. Scatter Plot
 fig.add_trace(
-    go.Scatter(
-        x=df['sales'], 
-        y=df['profit'],
+    scatter_trace(
+        df['sales'], 
+        df['profit'],
         mode='markers',
         marker=dict(
             size=8,
@@ -69,8 +460,9 @@ y = np.linspace(-5, 5, 50)
 X, Y = np.meshgrid(x, y)
 Z = np.sin(np.sqrt(X**2 + Y**2))
 
+# Surface takes 1-D axes; passing the X/Y meshgrids would serialize 2 extra grids
 fig.add_trace(
-    go.Surface(x=X, y=Y, z=Z, colorscale='Viridis', name='3D Surface'),
+    go.Surface(x=x, y=y, z=Z, colorscale='Viridis', name='3D Surface'),
     row=2, col=2
 )
 
@@ -83,29 +475,32 @@ fig.update_layout(
 )
 
 # Save as HTML (interactive)
-fig.write_html('plotly_dashboard.html')
-print("Interactive dashboard saved as 'plotly_dashboard.html'")
+path = save_html(fig, 'plotly_dashboard.html')
+print(f"Interactive dashboard saved as '{path}'")
 
 # Also save as static image (requires kaleido: pip install kaleido)
 try:
-    fig.write_image('plotly_dashboard.png', width=1200, height=800)
-    print("Static image saved as 'plotly_dashboard.png'")
+    results = export_images({'plotly_dashboard': fig}, width=1200, height=800)
 except Exception as e:
-    print(f"To save static images, install kaleido: pip install kaleido")
+    print(f"Static image export failed: {e}")
+else:
+    for result in results:
+        if result['error']:
+            print(f"Failed to export '{result['path']}': {result['error']}")
+        else:
+            print(f"Static image saved as '{result['path']}' ({result['seconds']:.2f}s)")
 
-# Create a separate animated chart
-fig_animated = px.scatter(
-    df, 
-    x='sales', 
+# Create a separate animated chart (one frame per row, delta-encoded)
+fig_animated = build_frame_animation(
+    df,
+    x='sales',
     y='profit',
-    animation_frame=df.index,
     size='costs',
     color='costs',
-    hover_name=df.index,
     range_x=[df['sales'].min()-10, df['sales'].max()+10],
     range_y=[df['profit'].min()-10, df['profit'].max()+10],
     title='Animated Scatter Plot'
 )
 
-fig_animated.write_html('plotly_animated.html')
-print("Animated chart saved as 'plotly_animated.html'")
+path = save_html(fig_animated, 'plotly_animated.html')
+print(f"Animated chart saved as '{path}'")